@@ -2,12 +2,20 @@ import math
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from dataclasses import dataclass
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 import numpy as np
+from matplotlib import rcParams
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection
 from matplotlib.figure import Figure
 
+try:  # optional JIT for the curve kernel
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 # -----------------------------
 # Calibration of Hc(slope)
@@ -32,21 +40,64 @@ ANCHORS: List[Tuple[float, float]] = [
 ]
 
 SLOPE_MIN, SLOPE_MAX = 0.2, 4.0
+# slopes drawn as the faint "show all" overlay
+_OVERLAY_SLOPES = np.round(np.linspace(SLOPE_MIN, SLOPE_MAX, 16), 1)
+# overlay curves that get a slope label at x≈-18
+_LABEL_SLOPES = _OVERLAY_SLOPES[np.isin(_OVERLAY_SLOPES, (0.2, 0.6, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0))]
+
+
+# ANCHORS are sorted by slope, so the interpolation grid can be built once at import.
+_S_VALS = np.fromiter((p[0] for p in ANCHORS), dtype=np.float64)
+_H_VALS = np.fromiter((p[1] for p in ANCHORS), dtype=np.float64)
+_S_MIN, _S_MAX = _S_VALS[0], _S_VALS[-1]
+
 
+def hc_from_slope_vec(s) -> np.ndarray:
+    """Vectorized Hc(slope): one interpolation through ANCHORS for a whole array of slopes."""
+    return np.interp(np.clip(s, _S_MIN, _S_MAX), _S_VALS, _H_VALS)
 
+
+@lru_cache(maxsize=4096)
 def hc_from_slope(s: float) -> float:
     """Linear interpolation of Hc(slope) through ANCHORS."""
-    s_vals = np.array([p[0] for p in ANCHORS], dtype=float)
-    h_vals = np.array([p[1] for p in ANCHORS], dtype=float)
-    s_clamped = np.clip(s, s_vals.min(), s_vals.max())
-    return float(np.interp(s_clamped, s_vals, h_vals))
+    return float(hc_from_slope_vec(s))
 
 
 def tflow(room: float, tout: float, slope: float, tmin: float, tmax: float) -> float:
     """Compute supply temperature by the calibrated model with clamp."""
-    hc = hc_from_slope(slope)
+    s = slope if _S_MIN <= slope <= _S_MAX else min(max(slope, _S_MIN), _S_MAX)
+    hc = float(np.interp(s, _S_VALS, _H_VALS))
     tf = room + hc * (room - tout)
-    return float(max(tmin, min(tmax, tf)))
+    return float(tmin if tf < tmin else tmax if tf > tmax else tf)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _curve_kernel(room, x, hc_arr, tmin, tmax, out):
+        """out[i, j] = clamp(tmin, room + hc_arr[i] * (room - x[j]), tmax) in a single fused pass."""
+        for i in range(hc_arr.size):
+            h = hc_arr[i]
+            for j in range(x.size):
+                v = room + h * (room - x[j])
+                out[i, j] = tmin if v < tmin else (tmax if v > tmax else v)
+else:
+    def _curve_kernel(room, x, hc_arr, tmin, tmax, out):
+        """NumPy fallback for the numba kernel (same result, written into out)."""
+        np.multiply(hc_arr[:, None], room - x[None, :], out=out)
+        out += room
+        np.clip(out, tmin, tmax, out=out)
+
+
+# room setpoint guide lines: plotted with the "slope=1" look
+_RT = np.array([18.0, 20.0, 22.0])
+_HC_1 = hc_from_slope(1.0)
+# Hc of the overlay and label slopes never changes either
+_OVERLAY_HC = hc_from_slope_vec(_OVERLAY_SLOPES)
+_LABEL_HC = hc_from_slope_vec(_LABEL_SLOPES)
+
+
+# UI inputs are snapped to the slider steps, so only a small set of argument tuples ever recurs.
+_tflow_cached = lru_cache(maxsize=4096)(tflow)
 
 
 # -----------------------------
@@ -58,6 +109,34 @@ ACCENT     = "#22c55e"   # green-500
 MUTED      = "#94a3b8"   # slate-400
 FG         = "#e5e7eb"   # gray-200
 
+# colours of the default line cycle, so collections look like the individual lines they replace
+_CYCLE_COLORS = rcParams["axes.prop_cycle"].by_key()["color"]
+
+
+def _cycle_colors(offset: int) -> List[str]:
+    """The line cycle starting at its offset-th colour (as if offset lines had been plotted before)."""
+    offset %= len(_CYCLE_COLORS)
+    return _CYCLE_COLORS[offset:] + _CYCLE_COLORS[:offset]
+
+
+def _segments(x: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Stack a shared x grid with a (n, len(x)) block of y values into LineCollection segments."""
+    return np.stack(np.broadcast_arrays(x[None, :], ys), axis=-1)
+
+
+def _configure_styles(style: ttk.Style):
+    """Apply the clam theme and the app's custom ttk styles."""
+    style.theme_use("clam")
+    style.configure("TFrame", background=PRIMARY_BG)
+    style.configure("Card.TFrame", background=CARD_BG, relief="flat")
+    style.configure("TLabel", background=PRIMARY_BG, foreground=FG, font=("Segoe UI", 10))
+    style.configure("Card.TLabel", background=CARD_BG, foreground=FG, font=("Segoe UI", 10))
+    style.configure("Title.TLabel", font=("Segoe UI Semibold", 13))
+    style.configure("H1.TLabel", font=("Segoe UI Semibold", 16))
+    style.configure("TButton", background=ACCENT, foreground="#0b1320", font=("Segoe UI Semibold", 10), borderwidth=0, padding=8)
+    style.map("TButton", background=[("active", "#16a34a")])
+    style.configure("TCheckbutton", background=CARD_BG, foreground=FG)
+
 
 @dataclass
 class State:
@@ -76,6 +155,10 @@ class App(tk.Tk):
         super().__init__()
         self.title("calorMATIC 630 • Heating Curves (Tkinter)")
         self.state = State()
+        # slider callbacks are coalesced into one redraw per idle cycle
+        self._pending = False
+        # inputs the background was last drawn with (see _background_state)
+        self._last_state = None
 
         # window
         self.configure(bg=PRIMARY_BG)
@@ -83,17 +166,7 @@ class App(tk.Tk):
         self.minsize(960, 640)
 
         # ttk theme (clam) + custom styles
-        style = ttk.Style()
-        style.theme_use("clam")
-        style.configure("TFrame", background=PRIMARY_BG)
-        style.configure("Card.TFrame", background=CARD_BG, relief="flat")
-        style.configure("TLabel", background=PRIMARY_BG, foreground=FG, font=("Segoe UI", 10))
-        style.configure("Card.TLabel", background=CARD_BG, foreground=FG, font=("Segoe UI", 10))
-        style.configure("Title.TLabel", font=("Segoe UI Semibold", 13))
-        style.configure("H1.TLabel", font=("Segoe UI Semibold", 16))
-        style.configure("TButton", background=ACCENT, foreground="#0b1320", font=("Segoe UI Semibold", 10), borderwidth=0, padding=8)
-        style.map("TButton", background=[("active", "#16a34a")])
-        style.configure("TCheckbutton", background=CARD_BG, foreground=FG)
+        _configure_styles(ttk.Style(self))
 
         # Layout: left controls, right plot
         main = ttk.Frame(self)
@@ -190,14 +263,14 @@ class App(tk.Tk):
     def _sync_entry_to_var(self, sv, var, vmin, vmax, step, on_change):
         try:
             val = float(sv.get())
-            val = min(max(val, vmin), vmax)
+            val = vmin if val < vmin else (vmax if val > vmax else val)
             # snap to step
             if step >= 1:
                 val = round(val / step) * step
             else:
                 val = round(val / step) * step
             var.set(val)
-            self._on_change()
+            on_change()
         except ValueError:
             sv.set(f"{var.get():.1f}")
 
@@ -218,71 +291,130 @@ class App(tk.Tk):
         self.ax.set_facecolor("#0b1224")
         self.fig.patch.set_facecolor(CARD_BG)
 
+        # axes decoration never changes, so it is set up once
+        self.ax.set_xlabel("Зовнішня температура, °C", color=FG)
+        self.ax.set_ylabel("Температура подачі, °C", color=FG)
+        self.ax.set_xlim(20, -20)   # like the Vaillant chart: warm → cold to the right
+        self.ax.set_ylim(20, 90)
+        self.ax.tick_params(colors=FG)
+        for spine in self.ax.spines.values():
+            spine.set_color(MUTED)
+
+        # the outdoor-temperature grids never change; y_sel is computed in place into _y_buf
+        self._x400 = np.linspace(20.0, -20.0, 400)
+        self._x200 = np.linspace(20.0, -20.0, 200)
+        self._y_buf = np.empty((1, self._x400.size))
+        self._hc_buf = np.empty(1)
+        # the 18/20/22 °C guide lines depend on nothing the user can change
+        rt = _RT[:, None]
+        self._ref_segments = _segments(self._x200, np.clip(rt + _HC_1 * (rt - self._x200[None, :]), 20.0, 90.0))
+        # unclipped overlay curves per (rounded) room setpoint
+        self._curve_cache: Dict[float, np.ndarray] = {}
+
+        # background: curves/labels rebuilt by _refresh_plot, cached as a bitmap after each full draw
+        self._bg_artists = []
+        self._bg = None
+        # foreground: selected slope + operating point, blitted over the cached background
+        # explicit colour: any cycle colour would repeat one of the overlay or guide lines
+        self._sel_line, = self.ax.plot([], [], color=FG, linewidth=2.6, alpha=0.95, animated=True)
+        self._op_point = self.ax.scatter([np.nan], [np.nan], s=60, zorder=5, color=ACCENT, animated=True)
+
         self.canvas = FigureCanvasTkAgg(self.fig, master=parent)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=12, pady=12)
 
-    def _refresh_plot(self):
-        room = float(self.room_var.get())
-        tout = float(self.tout_var.get())
-        slope = float(self.slope_var.get())
-        tmin = float(self.tmin_var.get())
-        tmax = float(self.tmax_var.get())
-
-        # recompute current point
-        tf = tflow(room, tout, slope, tmin, tmax)
+    def _on_draw(self, _event):
+        # savefig draws at its own dpi/crop; that bitmap must not become the on-screen background
+        if self.canvas.is_saving():
+            return
+        # a full draw leaves out animated artists: grab the background, then paint them on top
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self._sel_line)
+        self.ax.draw_artist(self._op_point)
+
+    def _update_selection(self, room: float, tout: float, slope: float, tmin: float, tmax: float):
+        """Recompute the current point and move the foreground artists (no drawing)."""
+        tf = _tflow_cached(room, tout, slope, tmin, tmax)
         self.result_lbl.config(text=f"Подача: {tf:.1f} °C   (s={slope:.1f}, "
                                     f"Tкімн={room:.1f} °C, Tзовн={tout:.1f} °C, "
                                     f"Tmin={tmin:.0f} °C, Tmax={tmax:.0f} °C)")
 
-        # redraw
-        self.ax.clear()
-
-        # grid & axes
-        self.ax.set_xlabel("Зовнішня температура, °C", color=FG)
-        self.ax.set_ylabel("Температура подачі, °C", color=FG)
-        self.ax.set_xlim(20, -20)   # like the Vaillant chart: warm → cold to the right
-        self.ax.set_ylim(20, 90)
+        # highlight selected slope
+        self._hc_buf[0] = hc_from_slope(slope)
+        _curve_kernel(room, self._x400, self._hc_buf, tmin, tmax, self._y_buf)
+        self._sel_line.set_data(self._x400, self._y_buf[0])
 
-        if self.show_grid_var.get():
-            self.ax.grid(True, which="both", alpha=0.25)
+        # current operating point
+        self._op_point.set_offsets([[tout, tf]])
 
-        # room setpoint guide lines (18/20/22 °C)
-        if self.show_182022_var.get():
-            for rt in (18, 20, 22):
-                x = np.linspace(20, -20, 200)
-                # plot reference curve with "slope=1" look but in our model it's just room line for s=0 baseline
-                y = np.clip(rt + hc_from_slope(1.0) * (rt - x), 20, 90)
-                self.ax.plot(x, y, linestyle="--", linewidth=0.8, alpha=0.35)
+    def _refresh_plot(self):
+        # read every Tk variable once; each get() is a round-trip into the Tcl interpreter
+        self._last_state = self._background_state()
+        room, tmin, tmax, show_all, show_grid, show_182022 = self._last_state
+        tout, slope = self._selection_inputs()
 
-        # all curves (0.2…4.0) for current room setpoint
-        x = np.linspace(20, -20, 400)
-        if self.show_all_var.get():
-            for s in np.round(np.linspace(SLOPE_MIN, SLOPE_MAX, 16), 1):
-                y = np.clip(room + hc_from_slope(float(s)) * (room - x), float(self.tmin_var.get()), float(self.tmax_var.get()))
-                self.ax.plot(x, y, linewidth=1.0, alpha=0.35)
-                # annotate a few
-                if s in (0.2, 0.6, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0):
-                    # place label at x≈-18
-                    xi = -18
-                    yi = float(room + hc_from_slope(float(s)) * (room - xi))
-                    yi = max(min(yi, float(self.tmax_var.get())), float(self.tmin_var.get()))
-                    self.ax.text(xi, yi, f"{s:.1f}", fontsize=8, color=FG, alpha=0.7)
+        self._update_selection(room, tout, slope, tmin, tmax)
 
-        # highlight selected slope
-        y_sel = np.clip(room + hc_from_slope(slope) * (room - x), tmin, tmax)
-        self.ax.plot(x, y_sel, linewidth=2.6, alpha=0.95)
+        # rebuild the background
+        for artist in self._bg_artists:
+            artist.remove()
+        self._bg_artists.clear()
 
-        # current operating point
-        self.ax.scatter([tout], [tf], s=60, zorder=5)
+        if show_grid:
+            self.ax.grid(True, which="both", alpha=0.25)
+        else:
+            self.ax.grid(False, which="both")
 
-        # styling
-        self.ax.tick_params(colors=FG)
-        for spine in self.ax.spines.values():
-            spine.set_color(MUTED)
+        # room setpoint guide lines (18/20/22 °C)
+        if show_182022:
+            self._bg_artists.append(self.ax.add_collection(
+                LineCollection(self._ref_segments, colors=_CYCLE_COLORS, linestyles="--", linewidths=0.8, alpha=0.35)))
 
+        # all curves (0.2…4.0) for current room setpoint
+        x = self._x400
+        if show_all:
+            key = round(room, 1)
+            y = self._curve_cache.get(key)
+            if y is None:
+                y = _OVERLAY_HC[:, None] * (key - x[None, :]) + key
+                self._curve_cache[key] = y
+            y = np.clip(y, tmin, tmax)
+            self._bg_artists.append(self.ax.add_collection(
+                LineCollection(_segments(x, y), colors=_cycle_colors(len(_RT) if show_182022 else 0), linewidths=1.0, alpha=0.35)))
+            # annotate a few, placing labels at x≈-18
+            y_lab = np.clip(key + _LABEL_HC * (key - (-18)), tmin, tmax)
+            for s, yi in zip(_LABEL_SLOPES, y_lab):
+                self._bg_artists.append(self.ax.text(-18, yi, f"{s:.1f}", fontsize=8, color=FG, alpha=0.7))
+
+        # full draw; _on_draw re-caches the background and paints the foreground
         self.canvas.draw_idle()
 
+    # Inputs are snapped to the slider steps (0.1 for room/slope, 1 °C otherwise) as they are read,
+    # so foreground and background use the same values and the cached model calls hit.
+    def _background_state(self) -> tuple:
+        """Inputs the background depends on; slope and outdoor temperature only move the foreground."""
+        return (round(float(self.room_var.get()), 1), round(float(self.tmin_var.get()), 0),
+                round(float(self.tmax_var.get()), 0),
+                self.show_all_var.get(), self.show_grid_var.get(), self.show_182022_var.get())
+
+    def _selection_inputs(self) -> Tuple[float, float]:
+        """(tout, slope), snapped to the slider steps."""
+        return round(float(self.tout_var.get()), 0), round(float(self.slope_var.get()), 1)
+
+    def _blit_selection(self, state: tuple):
+        """Fast path for slope/outdoor changes: only the foreground moves. state is _background_state()."""
+        room, tmin, tmax = state[:3]
+        tout, slope = self._selection_inputs()
+        self._update_selection(room, tout, slope, tmin, tmax)
+        if self._bg is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._bg)
+        self.ax.draw_artist(self._sel_line)
+        self.ax.draw_artist(self._op_point)
+        self.canvas.blit(self.ax.bbox)
+
     # ---------- Buttons ----------
     def _reset(self):
         self.room_var.set(20.0)
@@ -305,13 +437,28 @@ class App(tk.Tk):
             return
         try:
             self.fig.savefig(fpath, dpi=150, bbox_inches="tight")
+            # savefig swapped out the Agg renderer; redraw so the background is captured again
+            self._bg = None
+            self.canvas.draw_idle()
             messagebox.showinfo("Збережено", f"Графік збережено у файл:\n{fpath}")
         except Exception as e:
             messagebox.showerror("Помилка", f"Не вдалося зберегти файл:\n{e}")
 
     # ---------- Events ----------
     def _on_change(self, *_):
-        self._refresh_plot()
+        if self._pending:
+            return
+        self._pending = True
+        self.after_idle(self._do_refresh)
+
+    def _do_refresh(self):
+        self._pending = False
+        # full redraw only if something behind the selected curve changed; otherwise blit
+        state = self._background_state()
+        if self._bg is not None and state == self._last_state:
+            self._blit_selection(state)
+        else:
+            self._refresh_plot()
 
 
 if __name__ == "__main__":
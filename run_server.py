@@ -1,17 +1,83 @@
-
+import datetime
+import email.utils
+import gzip
 import http.server
-import socketserver
+import io
 import os
+from functools import lru_cache
 
 PORT = 8000
 HERE = os.path.dirname(os.path.abspath(__file__))
 os.chdir(HERE) 
 
+COMPRESSIBLE = {".html", ".css", ".js", ".json", ".svg", ".txt"}
+
+@lru_cache(maxsize=64)
+def gzip_body(path, mtime, gz_mtime):
+    """Gzipped contents of path: a precompressed path.gz if present, else compressed once and cached."""
+    if gz_mtime is not None:
+        with open(path + ".gz", "rb") as f:
+            return f.read()
+    with open(path, "rb") as f:
+        return gzip.compress(f.read())
+
 class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive: the page and its assets share connections
+
     def log_message(self, fmt, *args):
         pass 
 
-with socketserver.TCPServer(("", PORT), QuietHandler) as httpd:
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].split("#", 1)[0].endswith("/"):
+            for index in ("index.html", "index.htm"):
+                if os.path.isfile(os.path.join(path, index)):
+                    path = os.path.join(path, index)
+                    break
+        if (not os.path.isfile(path)
+                or os.path.splitext(path)[1].lower() not in COMPRESSIBLE
+                or "gzip" not in self.headers.get("Accept-Encoding", "")):
+            return super().send_head()
+
+        mtime = os.path.getmtime(path)
+        gz_mtime = os.path.getmtime(path + ".gz") if os.path.isfile(path + ".gz") else None
+        modified = max(mtime, gz_mtime or mtime)
+        if self.not_modified_since(modified):
+            self.send_response(304)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+
+        body = gzip_body(path, mtime, gz_mtime)
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Last-Modified", self.date_time_string(int(modified)))
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def not_modified_since(self, mtime):
+        """Same If-Modified-Since check SimpleHTTPRequestHandler.send_head does for plain files."""
+        if "If-Modified-Since" not in self.headers or "If-None-Match" in self.headers:
+            return False
+        try:
+            ims = email.utils.parsedate_to_datetime(self.headers["If-Modified-Since"])
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if ims.tzinfo is None:
+            ims = ims.replace(tzinfo=datetime.timezone.utc)
+        if ims.tzinfo is not datetime.timezone.utc:
+            return False
+        last_modif = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).replace(microsecond=0)
+        return last_modif <= ims
+
+class Server(http.server.ThreadingHTTPServer):
+    allow_reuse_address = True   # restart without waiting for TIME_WAIT
+    request_queue_size = 64      # the browser opens several connections for /app/ at once
+
+with Server(("", PORT), QuietHandler) as httpd:
     print(f"Serving on http://127.0.0.1:{PORT}/app/")
     try:
         httpd.serve_forever()